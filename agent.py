@@ -10,13 +10,35 @@ from livekit.plugins import (
 )
 from livekit.plugins import google
 from prompts import AGENT_INSTRUCTION, SESSION_INSTRUCTION
-from tools import get_weather, search_web, send_email
+from tools import get_weather, search_web, send_email, get_user_context, remember_user_context
 from language_middleware import LanguageAgentHook
 from tts_sync_middleware import TTSSyncMiddleware
 from emotions_middleware import EmotionsMiddleware
 from android_control_middleware import AndroidControlMiddleware
 load_dotenv()
 
+# Info-seeking phrase tables for process_query_with_middlewares, each compiled once into a
+# single substring alternation instead of being rebuilt and scanned phrase by phrase per query
+_QUESTION_PHRASES = [
+    'what is', 'who is', 'when did', 'where is', 'why does', 'how does', 'how to',
+    'tell me about', 'explain', 'define', 'meaning of', 'difference between',
+    'what are', 'who are', 'when was', 'where are', 'why is', 'how do',
+    'can you tell me', 'do you know', 'i want to know'
+]
+_INFO_KEYWORDS = [
+    'current', 'latest', 'news', 'update', 'fact', 'information', 'details about',
+    'history of', 'origin of', 'cause of', 'reason for', 'about', 'regarding',
+    'population', 'capital', 'area', 'located', 'founded', 'established'
+]
+_IMPERATIVE_SEARCH = ['search', 'find', 'look up', 'google', 'tell me']
+
+def _phrase_re(phrases):
+    return re.compile('|'.join(map(re.escape, phrases)))
+
+_QUESTION_PHRASES_RE = _phrase_re(_QUESTION_PHRASES)
+_INFO_KEYWORDS_RE = _phrase_re(_INFO_KEYWORDS)
+_IMPERATIVE_SEARCH_RE = _phrase_re(_IMPERATIVE_SEARCH)
+
 
 class Assistant(Agent):
     def __init__(self) -> None:
@@ -29,7 +51,9 @@ class Assistant(Agent):
             tools=[
                 get_weather,
                 search_web,
-                send_email
+                send_email,
+                get_user_context,
+                remember_user_context
             ],
             instructions=AGENT_INSTRUCTION
         )
@@ -55,7 +79,8 @@ class Assistant(Agent):
                     if 'user_lang' in state:
                         self.language_hook.user_lang = state['user_lang']
                     if 'language_history' in state:
-                        self.language_hook.language_history = state['language_history']
+                        self.language_hook.language_history.clear()
+                        self.language_hook.language_history.extend(state['language_history'])
                     print(f"Loaded language state: {self.language_hook.user_lang}")
         except Exception as e:
             print(f"Could not load language state: {e}")
@@ -65,7 +90,7 @@ class Assistant(Agent):
         try:
             state = {
                 'user_lang': self.language_hook.user_lang,
-                'language_history': self.language_hook.language_history
+                'language_history': list(self.language_hook.language_history)
             }
             with open(self.language_state_file, 'w', encoding='utf-8') as f:
                 json.dump(state, f, ensure_ascii=False, indent=2)
@@ -106,7 +131,7 @@ class Assistant(Agent):
         detected_lang = self.language_hook.user_lang
 
         # Android device control
-        android_result = self.android_hook.process_user_command(user_text)
+        android_result = await self.android_hook.process_user_command_async(user_text)
         if android_result:
             agent_reply = android_result
         else:
@@ -154,23 +179,11 @@ class Assistant(Agent):
 
             if not tool_detected:
                 # Info-seeking detection
-                question_patterns = [
-                    'what is', 'who is', 'when did', 'where is', 'why does', 'how does', 'how to',
-                    'tell me about', 'explain', 'define', 'meaning of', 'difference between',
-                    'what are', 'who are', 'when was', 'where are', 'why is', 'how do',
-                    'can you tell me', 'do you know', 'i want to know'
-                ]
-                info_keywords = [
-                    'current', 'latest', 'news', 'update', 'fact', 'information', 'details about',
-                    'history of', 'origin of', 'cause of', 'reason for', 'about', 'regarding',
-                    'population', 'capital', 'area', 'located', 'founded', 'established'
-                ]
-                is_clear_question = any(pattern in user_text_lower for pattern in question_patterns)
-                has_info_keywords = any(kw in user_text_lower for kw in info_keywords)
-                info_keyword_count = sum(1 for kw in info_keywords if kw in user_text_lower)
+                is_clear_question = _QUESTION_PHRASES_RE.search(user_text_lower) is not None
+                has_info_keywords = _INFO_KEYWORDS_RE.search(user_text_lower) is not None
                 has_question_mark = '?' in user_text
-                is_imperative_search = any(word in user_text_lower for word in ['search', 'find', 'look up', 'google', 'tell me'])
-                needs_search = (is_clear_question or has_question_mark or is_imperative_search or info_keyword_count >= 1 or len(user_text.split()) > 8)
+                is_imperative_search = _IMPERATIVE_SEARCH_RE.search(user_text_lower) is not None
+                needs_search = (is_clear_question or has_question_mark or is_imperative_search or has_info_keywords or len(user_text.split()) > 8)
                 if needs_search:
                     try:
                         web_result = await search_web(user_text)
@@ -182,17 +195,18 @@ class Assistant(Agent):
                     agent_reply = "Of course, Sir. How may I assist you today?" if user_text_lower in ["hi", "hello", "hey"] else AGENT_INSTRUCTION.split("# Examples")[0].strip()
 
         # Always reply in user's detected language
-        translated_reply = self.language_hook.process_agent_output(agent_reply)
+        translated_reply = await self.language_hook.process_agent_output_async(agent_reply)
         if self.strict_tts_sync is None:
             from tts_sync_middleware import StrictTTSSyncMiddleware
             self.strict_tts_sync = StrictTTSSyncMiddleware()
         self.save_language_state()
-        tts_text = self.strict_tts_sync.get_strict_tts_text(translated_reply, web_result, persona='female', tts_lang=self.language_hook.get_tts_language())
         tts_lang = self.language_hook.get_tts_language()
+        tts_text, voice_config = self.strict_tts_sync.get_strict_tts_text(translated_reply, web_result, persona='female', tts_lang=tts_lang)
         return {
             "reply_text": translated_reply,
             "tts_text": tts_text,
-            "tts_lang": tts_lang
+            "tts_lang": tts_lang,
+            "voice_config": voice_config
         }
 
 async def entrypoint(ctx: agents.JobContext):
@@ -223,8 +237,8 @@ async def entrypoint(ctx: agents.JobContext):
     # user_text = "Who is the Prime Minister of India?"
     # result = agent.process_query_with_middlewares(user_text)
     # print(result)
-    # Always use result['tts_text'] and result['tts_lang'] for TTS output:
-    # tts_plugin.speak(result['tts_text'], language=result['tts_lang'])
+    # Always use result['tts_text'] and result['voice_config'] for TTS output:
+    # tts_plugin.speak(result['tts_text'], language=result['tts_lang'], voice=result['voice_config']['persona'])
 
     await session.generate_reply(
         instructions=SESSION_INSTRUCTION,
@@ -5,13 +5,13 @@ No changes required to original code. Import and use hooks as needed.
 """
 import random
 
-EMOTIONS = [
+EMOTIONS = (
     "😊", "😢", "😮", "😡", "😍", "🤔", "😎", "🥰", "😂", "🙄"
-]
+)
 
-PERSONALITY_TRAITS = [
+PERSONALITY_TRAITS = (
     "friendly", "empathetic", "curious", "knowledgeable", "playful", "supportive", "thoughtful", "witty"
-]
+)
 
 HUMAN_GIRL_PROMPT = (
     "You are a highly knowledgeable, friendly, and empathetic human girl. "
@@ -21,22 +21,23 @@ HUMAN_GIRL_PROMPT = (
 
 class EmotionsMiddleware:
     def __init__(self):
-        pass
+        # Private generator per middleware instead of the shared module-level one
+        self._rng = random.Random()
 
     def add_emotion(self, text):
-        emotion = random.choice(EMOTIONS)
+        emotion = self._rng.choice(EMOTIONS)
         return f"{emotion} {text}"
 
     def add_personality(self, text):
-        trait = random.choice(PERSONALITY_TRAITS)
+        trait = self._rng.choice(PERSONALITY_TRAITS)
         return f"({trait}) {text}"
 
     def enhance_reply(self, text):
-        # Add human-like prompt, emotion, and personality
-        reply = f"{HUMAN_GIRL_PROMPT} {text}"
-        reply = self.add_emotion(reply)
-        reply = self.add_personality(reply)
-        return reply
+        # Add human-like prompt, emotion, and personality in one pass
+        # (same layout as add_personality(add_emotion(prompt + text)))
+        emotion = self._rng.choice(EMOTIONS)
+        trait = self._rng.choice(PERSONALITY_TRAITS)
+        return f"({trait}) {emotion} {HUMAN_GIRL_PROMPT} {text}"
 
 # Usage:
 # emotions_hook = EmotionsMiddleware()
@@ -4,10 +4,23 @@ Middleware for automatic language detection, translation, and TTS/STT language s
 No changes required to original code. Import and use hooks as needed.
 """
 
-from langdetect import detect
-from googletrans import Translator
+import asyncio
+import functools
+import re
+from collections import deque
 
-translator = Translator()
+
+# One client for the whole process; googletrans keeps its HTTP connection alive between requests.
+# Built on first use, so English-only sessions never import googletrans (or its httpx stack)
+@functools.cache
+def _get_translator():
+    from googletrans import Translator
+    return Translator(timeout=10)
+
+def _detect(text):
+    # langdetect loads its language profiles on import; defer that until a text actually needs it
+    from langdetect import detect
+    return detect(text)
 
 # Supported languages (add more as needed)
 SUPPORTED_LANGUAGES = {
@@ -30,9 +43,27 @@ SUPPORTED_LANGUAGES = {
     # Add more as needed
 }
 
+# Scripts/accented letters that identify a language in short texts, checked in order
+_SCRIPT_RES = (
+    ('hi', re.compile(r'[\u0900-\u097F]')),  # Hindi (Devanagari)
+    ('bn', re.compile(r'[\u0980-\u09FF]')),  # Bengali
+    ('ta', re.compile(r'[\u0B80-\u0BFF]')),  # Tamil
+    ('fr', re.compile(r'[àâäéèêëïîôöùûüÿç]', re.IGNORECASE)),  # French
+    ('es', re.compile(r'[áéíóúüñ]', re.IGNORECASE)),  # Spanish
+    ('de', re.compile(r'[äöüß]', re.IGNORECASE)),  # German
+    ('ru', re.compile(r'[\u0400-\u04FF]')),  # Russian (Cyrillic)
+    ('zh-cn', re.compile(r'[\u4E00-\u9FFF]')),  # Chinese (CJK ideographs)
+)
+
 def detect_language(text):
+    """Detect language from text, memoised on its first DETECT_KEY_CHARS characters."""
+    if not text:
+        return 'en'
+    return _detect_language_cached(text[:DETECT_KEY_CHARS])
+
+def _detect_language_uncached(text):
     """Detect language from text with improved reliability."""
-    if not text or not text.strip():
+    if not text or text.isspace():
         return 'en'
 
     text = text.strip()
@@ -40,26 +71,13 @@ def detect_language(text):
     # For very short texts, use heuristics
     if len(text.split()) < 3:
         # Check for common non-English characters
-        if any(char in text for char in 'अआइईउऊएऐओऔकखगघङचछजझञटठडढणतथदधनपफबभमयरलवशषसह'):
-            return 'hi'  # Hindi
-        elif any(char in text for char in 'অআইঈউঊঋএঐওঔকখগঘঙচছজঝঞটঠডঢণতথদধনপফবভমযরলশষসহ'):
-            return 'bn'  # Bengali
-        elif any(char in text for char in 'அஆஇஈஉஊஎஏஐஒஓஔகஙசஞடணதநபமயரலவழளறன'):
-            return 'ta'  # Tamil
-        elif any(char in text for char in 'àâäéèêëïîôöùûüÿç'):
-            return 'fr'  # French
-        elif any(char in text for char in 'áéíóúüñ'):
-            return 'es'  # Spanish
-        elif any(char in text for char in 'äöüß'):
-            return 'de'  # German
-        elif any(char in text for char in 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'):
-            return 'ru'  # Russian
-        elif any(char in text for char in '的一是不了人我在有他这为之大来以个中上们到说国和地也子时道出而要于得可你年生自会好用家学'):
-            return 'zh-cn'  # Chinese
+        for code, script_re in _SCRIPT_RES:
+            if script_re.search(text):
+                return code
 
     # Use langdetect for longer texts
     try:
-        lang = detect(text)
+        lang = _detect(text)
         return lang if lang in SUPPORTED_LANGUAGES else 'en'
     except Exception as e:
         # Fallback: check for common words in different languages
@@ -83,9 +101,16 @@ def detect_language(text):
         # Default to English
         return 'en'
 
+# Language of a given string is stable, so repeat utterances skip langdetect
+DETECT_KEY_CHARS = 128
+_detect_language_cached = functools.lru_cache(maxsize=2048)(_detect_language_uncached)
+
+# Punctuation that marks a one-word text as a sentence worth translating
+_PUNCTUATION = frozenset('.,!?;:')
+
 def translate_text(text, dest_lang):
     """Translate text to destination language with improved reliability."""
-    if not text or not text.strip():
+    if not text or text.isspace():
         return text
 
     if dest_lang == 'en':
@@ -95,32 +120,36 @@ def translate_text(text, dest_lang):
     text = text.strip()
 
     # Skip translation for very short texts that might not translate well
-    if len(text.split()) < 2 and not any(char in text for char in '.,!?;:'):
+    if len(text.split()) < 2 and _PUNCTUATION.isdisjoint(text):
         return text
 
     try:
-        # Add timeout and retry logic
-        result = translator.translate(text, dest=dest_lang, timeout=10)
-
-        # Validate translation result
-        if result and result.text and result.text.strip():
-            translated = result.text.strip()
-
-            # Check if translation is actually different (not just the same text)
-            if translated.lower() != text.lower():
-                return translated
-            else:
-                # Translation returned same text, might be an error
-                return text
-        else:
-            return text
-
+        return _translate_one(text, dest_lang)
     except Exception as e:
         # Log the error for debugging
         import logging
         logging.warning(f"Translation error for '{text[:50]}...' to {dest_lang}: {e}")
         return text
 
+@functools.lru_cache(maxsize=4096)
+def _translate_one(text, dest_lang):
+    """Translate one cleaned string; errors propagate so failed lookups are never cached."""
+    result = _get_translator().translate(text, dest=dest_lang)
+
+    # Validate translation result
+    translated = result.text.strip() if result and result.text else ""
+    if translated:
+        # Check if translation is actually different (not just the same text); casefold also
+        # equates non-ASCII case variants such as German ß/SS
+        if translated.casefold() != text.casefold():
+            return translated
+    # Translation returned nothing or the same text, might be an error
+    return text
+
+def clear_translation_cache():
+    """Forget memoised translations, e.g. after the translator backend or a language pack changes."""
+    _translate_one.cache_clear()
+
 # Example hook for agent input/output
 class LanguageAgentHook:
     def __init__(self):
@@ -143,9 +172,10 @@ class LanguageAgentHook:
 # tts_lang = hook.get_tts_language()
 # Pass tts_lang to your TTS plugin
 
-# Patch: Enforce prompt.py instructions, persona, and automatic language switching
-from prompts import AGENT_INSTRUCTION
+# Replies shorter than this are language-checked before translating; longer ones always go to the translator
+SAME_LANG_CHECK_CHARS = 64
 
+# Patch: Enforce prompt.py instructions, persona, and automatic language switching
 class StrictPersonaAgentHook:
     """
     Enforces prompt.py instructions, persona, and automatic language switching for every reply.
@@ -155,23 +185,22 @@ class StrictPersonaAgentHook:
     def __init__(self):
         self.user_lang = 'en'
         self.confidence_threshold = 0.6  # Minimum confidence for language switching
-        self.language_history = []  # Track language detection history
         self.max_history = 5  # Keep last 5 language detections
+        self.language_history = deque(maxlen=self.max_history)  # Track language detection history
 
     def process_user_input(self, text):
         # Detect language with improved reliability
         detected_lang = detect_language(text)
 
-        # Add to history for consistency checking
+        # Add to history for consistency checking (the deque drops the oldest entry itself)
         self.language_history.append(detected_lang)
-        if len(self.language_history) > self.max_history:
-            self.language_history.pop(0)
 
         # Use majority voting for consistency (if we have enough history)
         if len(self.language_history) >= 3:
-            from collections import Counter
-            lang_counts = Counter(self.language_history[-3:])  # Last 3 detections
-            most_common_lang = lang_counts.most_common(1)[0][0]
+            # Majority of the last 3 detections (the oldest wins a three-way tie, as with Counter)
+            history = self.language_history
+            a, b, c = history[-3], history[-2], history[-1]
+            most_common_lang = a if a == b or a == c else (b if b == c else a)
 
             # Only switch if the new detection is consistent with recent history
             # or if it's a clear language change (different from current)
@@ -184,27 +213,33 @@ class StrictPersonaAgentHook:
         return text
 
     def process_agent_output(self, text):
-        # Always apply persona and prompt instructions
-        persona_prefix = "(female persona) " if "female" in AGENT_INSTRUCTION.lower() else ""
+        # The persona is not written into the reply; it reaches the TTS plugin as voice_config
+        # (tts_sync_middleware), so it is never spoken
 
         # Keep the full text but ensure it ends with a period if needed
         reply = text.strip()
-        if not reply.endswith('.') and not reply.endswith('!') and not reply.endswith('?'):
+        if not reply.endswith(('.', '!', '?')):
             reply = reply + '.'
 
-        # Apply persona prefix
-        reply = f"{persona_prefix}{reply}"
+        # Already in the user's language (English, or a short reply the LLM wrote in their language):
+        # skip the translator round trip; detect_language is memoised, so this check is cheap
+        if self.user_lang == 'en' or (len(reply) < SAME_LANG_CHECK_CHARS and detect_language(reply) == self.user_lang):
+            return reply
 
         # Always translate reply to user's detected language
         translated_reply = translate_text(reply, self.user_lang)
 
         # Ensure translation worked (fallback to original if translation failed)
         if not translated_reply or translated_reply == reply:
-            # If translation failed, at least keep the persona
+            # If translation failed, keep the original reply
             return reply
 
         return translated_reply
 
+    async def process_agent_output_async(self, text):
+        """process_agent_output on a worker thread, for callers running inside the event loop"""
+        return await asyncio.to_thread(self.process_agent_output, text)
+
     def get_tts_language(self):
         return self.user_lang
 
@@ -217,7 +252,7 @@ class StrictPersonaAgentHook:
         lang_counts = Counter(self.language_history)
         return {
             'current': self.user_lang,
-            'history': self.language_history,
+            'history': list(self.language_history),
             'most_common': lang_counts.most_common(1)[0][0] if lang_counts else 'en',
             'total_detections': len(self.language_history)
         }
@@ -228,24 +263,9 @@ class StrictPersonaAgentHook:
 # agent_reply = strict_persona_hook.process_agent_output(agent_reply)
 # tts_lang = strict_persona_hook.get_tts_language()
 
-# Patch: Auto-detect and switch to user's spoken language for every input
-class AutoLanguageAgentHook:
-    """
-    Always detects and switches to user's spoken language automatically.
-    Does not touch original code.
-    """
-    def __init__(self):
-        self.user_lang = 'en'
-
-    def process_user_input(self, text):
-        self.user_lang = detect_language(text)
-        return text
-
-    def process_agent_output(self, text):
-        return translate_text(text, self.user_lang)
-
-    def get_tts_language(self):
-        return self.user_lang
+# Patch: Auto-detect and switch to user's spoken language for every input.
+# Behaves exactly like LanguageAgentHook, so it is the same class under its older name.
+AutoLanguageAgentHook = LanguageAgentHook
 
 # Usage:
 # auto_hook = AutoLanguageAgentHook()
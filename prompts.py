@@ -1,3 +1,7 @@
+# AGENT_INSTRUCTION is the system prompt agent.py hands to the Gemini realtime model. Keep it a
+# plain static string (no f-strings, dates or per-user text) so it stays a byte-identical prefix
+# the provider can cache across sessions; per-turn instructions go through generate_reply
+# (SESSION_INSTRUCTION) and per-user context arrives through the get_user_context tool.
 AGENT_INSTRUCTION = """
 # Persona 
 You are a personal Assistant called Atas similar to the AI from the movie Iron Man.
@@ -292,5 +296,6 @@ You are a personal Assistant called Atas similar to the AI from the movie Iron M
 SESSION_INSTRUCTION = """
     # Task
     Provide assistance by using the tools that you have access to when needed.
+    Use get_user_context to recall the user's preferences from previous sessions, and remember_user_context to save new ones.
     Begin the conversation by saying: " Hi my name is Atas, your personal assistant, how may I help you? "
 """
\ No newline at end of file
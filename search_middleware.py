@@ -3,9 +3,18 @@
 Middleware to intercept user queries and route information requests to web search for accurate answers.
 No changes required to original code. Import and use hooks as needed.
 """
+import asyncio
+import atexit
 import logging
 import re
-from ddgs import DDGS
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+try:
+    from ddgs import DDGS
+except ImportError:  # without ddgs, searches report "no results" instead of breaking every importer
+    DDGS = None
 
 logger = logging.getLogger(__name__)
 
@@ -50,81 +59,139 @@ QUESTION_PATTERNS = [
     r'which (is|are|was)'
 ]
 
+# Imperative search commands; 'tell me' on its own is not covered by INFO_KEYWORDS
+SEARCH_COMMANDS = ['search', 'find', 'look up', 'google', 'tell me', 'show me', 'what is', 'who is', 'how to']
+
+# Built once at import: every question pattern as one alternation (queries are lowercased
+# before matching, so no IGNORECASE)
+_QUESTION_RE = re.compile('|'.join(f'(?:{p})' for p in QUESTION_PATTERNS))
+
+# Single-word keywords match whole words only, so 'how' no longer fires on 'however' or 'now'
+# on 'know'; multi-word phrases stay a substring alternation (longest first)
+_ALL_KEYWORDS = set(INFO_KEYWORDS) | set(SEARCH_COMMANDS)
+_SINGLE_KEYWORDS = frozenset(kw for kw in _ALL_KEYWORDS if ' ' not in kw)
+_MULTI_KEYWORD_RE = re.compile('|'.join(
+    map(re.escape, sorted((kw for kw in _ALL_KEYWORDS if ' ' in kw), key=len, reverse=True))))
+_WORD_RE = re.compile(r"\w+")
+
+# One DDGS client per timeout for the process, so repeat searches reuse its HTTP connections and
+# TLS sessions; the timeout is enforced by the client's own HTTP layer
+DEFAULT_SEARCH_TIMEOUT = 10
+_ddgs_clients = {}
+_ddgs_lock = threading.Lock()
+
+def _get_ddgs(timeout=DEFAULT_SEARCH_TIMEOUT):
+    with _ddgs_lock:
+        client = _ddgs_clients.get(timeout)
+        if client is None:
+            client = _ddgs_clients[timeout] = DDGS(timeout=timeout)
+        return client
+
+@atexit.register
+def _close_ddgs():
+    # Closing is not safe alongside in-flight requests, so it happens once, at exit, under the lock
+    with _ddgs_lock:
+        for client in _ddgs_clients.values():
+            client.__exit__(None, None, None)
+
+def _format_result(i, result):
+    """One numbered line per search hit, or None when it has neither title nor body"""
+    title = result.get('title', '').strip()
+    # Collapse whitespace, then cut by characters: word-boundary truncation would drop whole
+    # CJK/Thai snippets or long URLs, which have no spaces to break on
+    body = ' '.join(result.get('body', '').split())
+    if len(body) > 200:  # Truncate long descriptions
+        body = body[:200] + "..."
+    if title and body:
+        return f"{i}. {title}: {body}"
+    if title or body:
+        return f"{i}. {title or body}"
+    return None
+
+# Result cache for SearchMiddleware: entries expire with their SEARCH_CACHE_TTL time bucket
+SEARCH_CACHE_SIZE = 512
+SEARCH_CACHE_TTL = 300
+
+def _search_cache_key(query):
+    """Case and spacing don't change the key; word order does ("delhi to paris" != "paris to delhi")"""
+    return " ".join(query.lower().split()), int(time.time() // SEARCH_CACHE_TTL)
+
 class SearchMiddleware:
-    def __init__(self):
-        pass
+    def __init__(self, timeout=DEFAULT_SEARCH_TIMEOUT, max_results=3,
+                 region='wt-wt', safesearch='moderate', backend='duckduckgo'):
+        self.timeout = timeout
+        self.max_results = max_results
+        # Pinning one region and backend skips ddgs's 'auto' fan-out across slower engines
+        self.region = region
+        self.safesearch = safesearch
+        self.backend = backend
+        self._result_cache = OrderedDict()
+        self._result_cache_lock = threading.Lock()
 
     def needs_web_search(self, text):
         """Enhanced search detection using keywords and regex patterns"""
-        if not text or not text.strip():
+        if not text or text.isspace():
             return False
 
-        text_lower = text.lower().strip()
+        # Question marks are the cheapest signal, so check them before any scanning
+        if '?' in text:
+            logger.info("Detected question mark")
+            return True
+
+        text_lower = text.strip().lower()
 
         # Check for question patterns using regex
-        for pattern in QUESTION_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                logger.info(f"Detected question pattern: {pattern}")
-                return True
-
-        # Check for info keywords
-        keyword_count = sum(1 for kw in INFO_KEYWORDS if kw in text_lower)
-        if keyword_count >= 1:  # Lower threshold for better detection
-            logger.info(f"Detected {keyword_count} info keywords")
+        match = _QUESTION_RE.search(text_lower)
+        if match:
+            logger.info(f"Detected question pattern: {match.group(0)!r}")
             return True
 
-        # Check for question marks
-        if '?' in text:
-            logger.info("Detected question mark")
+        # Check for info keywords and imperative search commands
+        words = _SINGLE_KEYWORDS.intersection(_WORD_RE.findall(text_lower))
+        if words:
+            logger.info(f"Detected info keywords: {sorted(words)}")
             return True
-
-        # Check for imperative search commands
-        search_commands = ['search', 'find', 'look up', 'google', 'tell me', 'show me', 'what is', 'who is', 'how to']
-        if any(cmd in text_lower for cmd in search_commands):
-            logger.info("Detected search command")
+        match = _MULTI_KEYWORD_RE.search(text_lower)
+        if match:
+            logger.info(f"Detected info phrase: {match.group(0)!r}")
             return True
 
         return False
 
     def get_web_result(self, query):
-        """Get web search results using DDGS with comprehensive error handling"""
+        """Get web search results using DDGS with proper error handling"""
         try:
-            logger.info(f"Searching DDGS for: {query}")
+            logger.info(f"Starting DDGS search for: {query}")
 
             # Clean and prepare the query
             query = query.strip()
             if not query:
                 return "Please provide a search query."
 
-            # Use DDGS for web search
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=3))
+            cache_key = _search_cache_key(query)
+            with self._result_cache_lock:
+                cached = self._result_cache.get(cache_key)
+                if cached is not None:
+                    self._result_cache.move_to_end(cache_key)
+                    logger.info(f"Serving cached search result for: {query}")
+                    return cached
+
+            # Use DDGS for web search, bounded by self.timeout
+            results = self._search(query)
 
             if not results:
                 logger.warning(f"No results found for query: {query}")
                 return f"I couldn't find any information about '{query}'. Please try rephrasing your question."
 
             # Format the results
-            formatted_results = []
-            for i, result in enumerate(results, 1):
-                title = result.get('title', '').strip()
-                body = result.get('body', '').strip()
-
-                if title and body:
-                    # Clean up the body text
-                    body = ' '.join(body.split())
-                    if len(body) > 200:  # Truncate long descriptions
-                        body = body[:200] + "..."
-
-                    formatted_results.append(f"{i}. {title}: {body}")
-                elif title:
-                    formatted_results.append(f"{i}. {title}")
-                elif body:
-                    formatted_results.append(f"{i}. {body}")
-
-            if formatted_results:
-                final_result = "\n".join(formatted_results)
+            final_result = "\n".join(filter(None, (_format_result(i, result) for i, result in enumerate(results, 1))))
+            if final_result:
                 logger.info(f"DDGS search successful, found {len(results)} results")
+                # Only successful results are cached; errors and empty searches are retried next time
+                with self._result_cache_lock:
+                    self._result_cache[cache_key] = final_result
+                    if len(self._result_cache) > SEARCH_CACHE_SIZE:
+                        self._result_cache.popitem(last=False)
                 return final_result
             else:
                 return f"I found some results for '{query}' but couldn't format them properly."
@@ -133,8 +200,23 @@ class SearchMiddleware:
             logger.error(f"DDGS search error for '{query}': {e}")
             return f"Sorry, I encountered an error while searching for '{query}'. Please try again."
 
+    async def aget_web_result(self, query):
+        """get_web_result on a worker thread, so async agents keep running while the search is in flight"""
+        return await asyncio.to_thread(self.get_web_result, query)
+
+    def _search(self, query):
+        if DDGS is None:
+            logger.warning("ddgs is not installed; web search is unavailable")
+            return []
+        # islice stops after max_results even if the backend yields more (or lazily paginates)
+        results = _get_ddgs(self.timeout).text(
+            query, region=self.region, safesearch=self.safesearch, backend=self.backend, max_results=self.max_results)
+        return list(islice(results, self.max_results))
+
     def process_user_query(self, text):
+        """Process user query and return search results if needed"""
         if self.needs_web_search(text):
+            logger.info(f"Web search triggered for: {text}")
             return self.get_web_result(text)
         return None
 
@@ -145,69 +227,18 @@ class SearchMiddleware:
 
 # Patch: Fast, robust web search with friendly error handling
 
-class FastSearchMiddleware:
+class FastSearchMiddleware(SearchMiddleware):
     """
     Fast web search with DDGS integration and timeout handling.
-    Provides reliable web search functionality.
+    Same implementation as SearchMiddleware, kept under this name for existing callers.
     """
-    def __init__(self, timeout=10, max_results=3):
-        self.timeout = timeout
-        self.max_results = max_results
-        self._search_middleware = SearchMiddleware()
-
-    def get_web_result(self, query):
-        """Get web search results using DDGS with proper error handling"""
-        try:
-            logger.info(f"Starting DDGS search for: {query}")
 
-            # Clean and prepare the query
-            query = query.strip()
-            if not query:
-                return "Please provide a search query."
-
-            # Use DDGS for web search
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=self.max_results))
-
-            if not results:
-                logger.warning(f"No results found for query: {query}")
-                return f"I couldn't find any information about '{query}'. Please try rephrasing your question."
-
-            # Format the results
-            formatted_results = []
-            for i, result in enumerate(results, 1):
-                title = result.get('title', '').strip()
-                body = result.get('body', '').strip()
-
-                if title and body:
-                    # Clean up the body text (remove excessive whitespace)
-                    body = ' '.join(body.split())
-                    if len(body) > 200:  # Truncate long descriptions
-                        body = body[:200] + "..."
-
-                    formatted_results.append(f"{i}. {title}: {body}")
-                elif title:
-                    formatted_results.append(f"{i}. {title}")
-                elif body:
-                    formatted_results.append(f"{i}. {body}")
-
-            if formatted_results:
-                final_result = "\n".join(formatted_results)
-                logger.info(f"DDGS search successful, found {len(results)} results")
-                return final_result
-            else:
-                return f"I found some results for '{query}' but couldn't format them properly."
-
-        except Exception as e:
-            logger.error(f"DDGS search error for '{query}': {e}")
-            return f"Sorry, I encountered an error while searching for '{query}'. Please try again."
+# Built once at import, so threads share one instance (and its result cache) without a lazy race
+_SHARED_FAST_SEARCH = FastSearchMiddleware()
 
-    def process_user_query(self, text):
-        """Process user query and return search results if needed"""
-        if self._search_middleware.needs_web_search(text):
-            logger.info(f"Web search triggered for: {text}")
-            return self.get_web_result(text)
-        return None
+def get_fast_search():
+    """The process-wide FastSearchMiddleware with default settings"""
+    return _SHARED_FAST_SEARCH
 
 # Usage:
 # fast_search = FastSearchMiddleware(timeout=5)
@@ -2,6 +2,8 @@
 """
 Test script to verify search middleware functionality
 """
+from concurrent.futures import ThreadPoolExecutor
+
 from search_middleware import FastSearchMiddleware
 
 def test_search():
@@ -17,10 +19,14 @@ def test_search():
         "What is machine learning?"
     ]
 
-    for query in test_queries:
+    # Searches are network-bound, so run them together; results still print in query order
+    with ThreadPoolExecutor(max_workers=len(test_queries)) as ex:
+        futures = [(query, ex.submit(search_hook.process_user_query, query)) for query in test_queries]
+
+    for query, future in futures:
         print(f"\n--- Testing query: {query} ---")
         try:
-            result = search_hook.process_user_query(query)
+            result = future.result()
             if result:
                 print(f"✅ Search successful!")
                 print(f"Result: {result[:200]}...")
@@ -1,6 +1,11 @@
 from flask import Flask, request
 from livekit.api import AccessToken, VideoGrants
+import functools
 import os
+import re
+import time
+import uuid
+from datetime import timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,23 +15,47 @@ app = Flask(__name__)
 API_KEY = os.getenv('LIVEKIT_API_KEY')
 API_SECRET = os.getenv('LIVEKIT_API_SECRET')
 
+ROOM_NAME = 'atas'
+PARTICIPANT_NAME = 'atas'
+
+# Every client gets its own identity (the agent keys stored user memories on it). A client
+# keeps its memories across sessions by sending its issued identity back as ?identity=...;
+# only the issued format (a random 128-bit id) is accepted, so another user's can't be guessed
+USER_IDENTITY_PREFIX = 'atas-user-'
+_IDENTITY_RE = re.compile(re.escape(USER_IDENTITY_PREFIX) + r'[0-9a-f]{32}')
+
+# A token is reused within its identity's refresh window, so it always has at least
+# TOKEN_TTL - TOKEN_REFRESH_INTERVAL of validity left when served
+TOKEN_TTL = timedelta(hours=6)
+TOKEN_REFRESH_INTERVAL = TOKEN_TTL / 2
+
+_GRANT = VideoGrants(room_join=True, room=ROOM_NAME)
+
+@functools.lru_cache(maxsize=1024)
+def _signed_token(identity, window):
+    return (
+        AccessToken(API_KEY, API_SECRET)
+        .with_identity(identity)
+        .with_name(PARTICIPANT_NAME)
+        .with_grants(_GRANT)
+        .with_ttl(TOKEN_TTL)
+        .to_jwt()
+    )
+
 @app.route('/token', methods=['GET'])
 def get_token():
-    room_name = 'atas'
-    participant_name = 'atas'
-
     if not API_KEY or not API_SECRET:
         return {'error': 'API key and secret not configured'}, 500
 
-    token = AccessToken(API_KEY, API_SECRET)
-    token.with_identity(participant_name)
-    token.with_name(participant_name)
-    grant = VideoGrants()
-    grant.room_join = True
-    grant.room = room_name
-    token.with_grants(grant)
+    identity = request.args.get('identity')
+    if identity is None:
+        identity = f"{USER_IDENTITY_PREFIX}{uuid.uuid4().hex}"
+    elif not _IDENTITY_RE.fullmatch(identity):
+        return {'error': 'Unknown identity'}, 400
 
-    return {'token': token.to_jwt()}
+    window = int(time.time() // TOKEN_REFRESH_INTERVAL.total_seconds())
+    return {'token': _signed_token(identity, window), 'identity': identity}
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Local runs only; the container serves the app through gunicorn
+    app.run()
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from livekit.agents import function_tool, RunContext
+from livekit.agents import function_tool, RunContext, get_job_context
 import requests
 from langchain_community.tools import DuckDuckGoSearchRun
 import os
@@ -37,11 +38,11 @@ async def search_web(
     """
     try:
         # Import our custom search middleware
-        from search_middleware import FastSearchMiddleware
+        from search_middleware import get_fast_search
 
-        # Use our enhanced search middleware
-        search_hook = FastSearchMiddleware(timeout=10, max_results=3)
-        results = search_hook.get_web_result(query)
+        # Use the shared search middleware, so repeat queries hit its result cache
+        search_hook = get_fast_search()
+        results = await search_hook.aget_web_result(query)
 
         if results and results.strip():
             logging.info(f"Search successful for '{query}': Found results")
@@ -54,6 +55,74 @@ async def search_web(
         logging.error(f"Error searching the web for '{query}': {e}")
         return f"Sorry, I encountered an error while searching for '{query}'. Please try again."
 
+_memory_client = None
+
+def _get_memory_client():
+    """mem0 client, created on first recall so sessions that never recall don't load it."""
+    global _memory_client
+    if _memory_client is None:
+        from mem0 import MemoryClient
+        _memory_client = MemoryClient(api_key=os.getenv("MEM0_API_KEY"))
+    return _memory_client
+
+# Identities issued to users by token_server.py (must match its USER_IDENTITY_PREFIX); the agent's
+# own participant and anything else in the room never match
+USER_IDENTITY_PREFIX = "atas-user-"
+
+def _session_user_id():
+    """Identity of the one user in this job's room; None when there is no user or more than one."""
+    room = get_job_context().room
+    users = [p.identity for p in room.remote_participants.values() if p.identity.startswith(USER_IDENTITY_PREFIX)]
+    return users[0] if len(users) == 1 else None
+
+@function_tool()
+async def get_user_context(
+    context: RunContext,  # type: ignore
+    ) -> str:
+    """
+    Recall stored preferences and context for the current user from previous sessions.
+    Call this when earlier preferences or history matter; it is never part of the system prompt.
+    """
+    user_id = None
+    try:
+        # The user comes from the session, never from the model, so only this user's memories are readable
+        user_id = _session_user_id()
+        if not user_id:
+            return "I can't tell which user I'm talking to, so there is no stored context to recall."
+        memories = await asyncio.to_thread(_get_memory_client().get_all, user_id=user_id)
+        if isinstance(memories, dict):
+            memories = memories.get("results", [])
+        facts = [m.get("memory", "").strip() for m in memories if m.get("memory")]
+        if facts:
+            logging.info(f"Recalled {len(facts)} memories for user {user_id}")
+            return "\n".join(f"- {fact}" for fact in facts)
+        return "No stored context for this user yet."
+    except Exception as e:
+        logging.error(f"Error recalling context for user {user_id}: {e}")
+        return "Stored user context is unavailable right now."
+
+@function_tool()
+async def remember_user_context(
+    context: RunContext,  # type: ignore
+    fact: str) -> str:
+    """
+    Store a preference or fact about the current user for future sessions.
+
+    Args:
+        fact: One short statement worth remembering, e.g. "Prefers replies in Hindi"
+    """
+    user_id = None
+    try:
+        user_id = _session_user_id()
+        if not user_id:
+            return "I can't tell which user I'm talking to, so nothing was stored."
+        await asyncio.to_thread(_get_memory_client().add, [{"role": "user", "content": fact}], user_id=user_id)
+        logging.info(f"Stored a memory for user {user_id}")
+        return "Noted for future sessions."
+    except Exception as e:
+        logging.error(f"Error storing context for user {user_id}: {e}")
+        return "I couldn't store that right now."
+
 @function_tool()    
 async def send_email(
     context: RunContext,  # type: ignore
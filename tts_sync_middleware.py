@@ -14,20 +14,20 @@ class TTSSyncMiddleware:
     def get_tts_text(self, reply_text, web_result=None, persona='female'):
         """
         If web_result is provided, use it for TTS. Otherwise, use reply_text.
-        Always ensure reply text uses female persona.
+        Returns (tts_text, voice_config); the persona travels in voice_config for the TTS
+        plugin's voice selection instead of being spoken as a text prefix.
         """
         tts_text = web_result if web_result else reply_text
-        # Ensure female persona in TTS output
-        if persona == 'female' and 'female' not in tts_text.lower():
-            tts_text = f"(female persona) {tts_text}"
-        return tts_text
+        return tts_text, {"persona": persona}
 
 # Usage:
 # tts_sync = TTSSyncMiddleware()
-# tts_text = tts_sync.get_tts_text(agent_reply, web_result)
-# Pass tts_text to your TTS plugin for speaking
+# tts_text, voice_config = tts_sync.get_tts_text(agent_reply, web_result)
+# Pass tts_text to your TTS plugin for speaking, choosing its voice from voice_config
 
 # Strict patch: Always use final reply and correct language for TTS
+# (translate_text memoises successful translations, so repeated TTS lines skip the translator;
+# language_middleware.clear_translation_cache() resets it)
 from language_middleware import translate_text
 
 class StrictTTSSyncMiddleware:
@@ -57,12 +57,10 @@ class StrictTTSSyncMiddleware:
             if tts_lang != 'en':
                 tts_text = translate_text(tts_text, tts_lang)
 
-        # Ensure female persona
-        if persona == 'female' and 'female' not in tts_text.lower():
-            tts_text = f"(female persona) {tts_text}"
-        return tts_text
+        # Persona and language go to the TTS plugin's voice selection, not into the spoken text
+        return tts_text, {"persona": persona, "lang": tts_lang}
 
 # Usage:
 # strict_tts = StrictTTSSyncMiddleware()
-# tts_text = strict_tts.get_strict_tts_text(final_reply, web_result, persona, tts_lang)
-# Pass tts_text and tts_lang to your TTS plugin for speaking
+# tts_text, voice_config = strict_tts.get_strict_tts_text(final_reply, web_result, persona, tts_lang)
+# Pass tts_text to your TTS plugin for speaking, with voice_config selecting the voice and language